@@ -8,9 +8,10 @@ Designed for continuous 24/7 operation with robust error handling.
 
 import os
 import sys
-import time
+import signal
 import logging
 import argparse
+import threading
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
@@ -45,6 +46,7 @@ class OpticShield:
         self.offline_queue: OfflineQueue = None
         self.system_monitor: SystemMonitor = None
         self._restart_count = 0
+        self._shutdown_event = threading.Event()
     
     def initialize(self) -> bool:
         """Initialize all components."""
@@ -95,6 +97,9 @@ class OpticShield:
                 )
             
             self.detection_service = DetectionService(self.config)
+            # DetectionService installs its own SIGTERM/SIGINT handlers when
+            # constructed; take them back so a signal only flags the shutdown
+            self._setup_signal_handlers()
             
             if not self.detection_service.initialize():
                 logger.error("Detection service initialization failed")
@@ -148,12 +153,34 @@ class OpticShield:
             logger.error(f"Initialization failed: {e}", exc_info=True)
             return False
     
+    def _setup_signal_handlers(self):
+        """
+        Route SIGTERM/SIGINT to a clean exit.
+        
+        The handler only flags the shutdown; run() wakes on the flag
+        immediately and stops every service from the main thread, so the
+        offline queue is drained and closed before the process exits
+        instead of the run loop re-initializing.
+        """
+        def signal_handler(signum, frame):
+            logger.info(f"Received signal {signum}, shutting down...")
+            self._shutdown_event.set()
+        
+        try:
+            signal.signal(signal.SIGTERM, signal_handler)
+            signal.signal(signal.SIGINT, signal_handler)
+        except Exception:
+            pass
+    
     def start(self):
         """Start all services."""
         logger.info("Starting OPTIC-SHIELD services...")
         
         self.system_monitor.start()
         
+        if self.offline_queue:
+            self.offline_queue.start()
+        
         if self.dashboard_client:
             self.dashboard_client.set_system_monitor(self.system_monitor)
             
@@ -216,18 +243,36 @@ class OpticShield:
         if self.dashboard_client:
             self.dashboard_client.stop()
         
+        if self.offline_queue:
+            self.offline_queue.stop()
+            self.offline_queue.close()
+        
         if self.system_monitor:
             self.system_monitor.stop()
         
         logger.info("All services stopped")
     
+    def _wait_while_running(self):
+        """Block until shutdown is requested or detection needs a restart."""
+        while self.detection_service.state == ServiceState.RUNNING:
+            if self._shutdown_event.wait(1):
+                return
+            
+            stats = self.get_stats()
+            if stats.get("detection_service", {}).get("error_count", 0) > 100:
+                logger.warning("High error count, triggering restart")
+                return
+    
     def run(self):
         """Run the application with auto-restart capability."""
-        while True:
+        # Installed before initialize() so a signal during startup is not lost
+        self._setup_signal_handlers()
+        
+        while not self._shutdown_event.is_set():
             try:
                 if not self.initialize():
                     logger.error("Initialization failed, retrying in 10 seconds...")
-                    time.sleep(10)
+                    self._shutdown_event.wait(10)
                     self._restart_count += 1
                     
                     if self._restart_count >= self.config.system.max_restart_attempts:
@@ -235,19 +280,12 @@ class OpticShield:
                         sys.exit(1)
                     continue
                 
-                self.start()
+                if self._shutdown_event.is_set():
+                    break
                 
-                while self.detection_service.state == ServiceState.RUNNING:
-                    time.sleep(1)
-                    
-                    stats = self.get_stats()
-                    if stats.get("detection_service", {}).get("error_count", 0) > 100:
-                        logger.warning("High error count, triggering restart")
-                        break
+                self.start()
+                self._wait_while_running()
                 
-            except KeyboardInterrupt:
-                logger.info("Keyboard interrupt received")
-                break
             except Exception as e:
                 logger.error(f"Runtime error: {e}", exc_info=True)
                 self._restart_count += 1
@@ -260,7 +298,7 @@ class OpticShield:
                     break
                 
                 logger.info(f"Restarting in {self.config.system.restart_delay_seconds} seconds...")
-                time.sleep(self.config.system.restart_delay_seconds)
+                self._shutdown_event.wait(self.config.system.restart_delay_seconds)
             finally:
                 self.stop()
         
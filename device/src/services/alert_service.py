@@ -6,7 +6,7 @@ Supports local GPIO alerts and remote dashboard notifications.
 import logging
 import time
 import threading
-from typing import Optional, Dict, Any, Callable
+from typing import Optional, Dict, Any, Callable, List
 from dataclasses import dataclass
 
 from ..core.config import Config
@@ -91,6 +91,9 @@ class AlertService:
         if not self.config.alerts.enabled:
             return
         
+        # Queued uploads for the whole event go to the offline queue together
+        queued = []
+        
         for detection in event.detections:
             is_high_priority = detection.class_name in self.HIGH_PRIORITY_CLASSES
             
@@ -99,13 +102,18 @@ class AlertService:
             
             # Use new upload service for detection-to-portal uploads
             if self.upload_service and self.config.alerts.remote.enabled:
-                self._upload_detection(event, detection, is_high_priority)
+                queued_detection = self._upload_detection(event, detection, is_high_priority)
+                if queued_detection:
+                    queued.append(queued_detection)
             elif self.config.alerts.remote.enabled and self.dashboard_client:
                 # Fallback to legacy dashboard client
                 self._send_remote_alert(event, detection, is_high_priority)
             
             self._alert_count += 1
             self._last_alert_time[detection.class_name] = time.time()
+        
+        if queued:
+            self._queue_uploads(queued)
     
     def _trigger_local_alert(self, class_name: str, high_priority: bool = False):
         """Trigger local GPIO alert (buzzer/LED)."""
@@ -220,10 +228,16 @@ class AlertService:
         event: DetectionEvent,
         detection,
         high_priority: bool = False
-    ):
-        """Upload detection to portal using the upload service."""
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Upload detection to portal using the upload service.
+        
+        High-priority detections are uploaded here. Others are returned as
+        queue_detection() arguments so the caller can queue the whole
+        event's detections in one batch.
+        """
         if not self.upload_service:
-            return
+            return None
         
         try:
             # Get image data for upload
@@ -257,24 +271,35 @@ class AlertService:
                     logger.warning(f"High-priority upload queued for retry: {detection.class_name}")
             else:
                 # Queue for batch upload
-                event_id = self.upload_service.queue_detection(
-                    detection_id=self._alert_count,
-                    class_name=detection.class_name,
-                    class_id=detection.class_id,
-                    confidence=detection.confidence,
-                    bbox=list(detection.bbox),
-                    camera_id=self._camera_id,
-                    image_path=None,
-                    image_data=image_base64.encode() if image_base64 else None,
-                    priority=5 if detection.class_name in self.HIGH_PRIORITY_CLASSES else 0,
-                    metadata=metadata
-                )
-                logger.debug(f"Detection queued for upload: {event_id}")
+                return {
+                    "detection_id": self._alert_count,
+                    "class_name": detection.class_name,
+                    "class_id": detection.class_id,
+                    "confidence": detection.confidence,
+                    "bbox": list(detection.bbox),
+                    "camera_id": self._camera_id,
+                    "image_path": None,
+                    "image_data": image_base64.encode() if image_base64 else None,
+                    "priority": 5 if detection.class_name in self.HIGH_PRIORITY_CLASSES else 0,
+                    "metadata": metadata
+                }
                 
         except Exception as e:
             logger.error(f"Failed to upload detection: {e}")
             if self.event_logger:
                 self.event_logger.log_system_error(str(e), "alert_service")
+        
+        return None
+    
+    def _queue_uploads(self, detections: List[Dict[str, Any]]):
+        """Queue an event's non-urgent detections for batch upload."""
+        try:
+            event_ids = self.upload_service.queue_detections(detections)
+            logger.debug(f"Detections queued for upload: {', '.join(event_ids)}")
+        except Exception as e:
+            logger.error(f"Failed to queue detections: {e}")
+            if self.event_logger:
+                self.event_logger.log_system_error(str(e), "alert_service")
     
     def get_stats(self) -> Dict[str, Any]:
         """Get alert service statistics."""
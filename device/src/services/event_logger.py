@@ -13,6 +13,8 @@ from dataclasses import dataclass, asdict
 from datetime import datetime
 from enum import Enum
 
+from ..utils import json_codec
+
 logger = logging.getLogger(__name__)
 
 
@@ -47,6 +49,10 @@ class DetectionEventLog:
     
     def to_json(self) -> str:
         return json.dumps(self.to_dict())
+    
+    def to_json_line(self) -> bytes:
+        """Encode as one UTF-8 JSONL record, newline included."""
+        return json_codec.dumps(self.to_dict(), newline=True)
 
 
 class EventLogger:
@@ -277,9 +283,10 @@ class EventLogger:
         """Write event to log file."""
         with self._lock:
             try:
+                line = event.to_json_line()
                 log_file = self._get_log_file()
-                with open(log_file, 'a') as f:
-                    f.write(event.to_json() + '\n')
+                with open(log_file, 'ab') as f:
+                    f.write(line)
                 self._event_count += 1
             except Exception as e:
                 logger.error(f"Failed to write event log: {e}")
@@ -309,13 +316,13 @@ class EventLogger:
                 if len(events) >= limit:
                     break
                 
-                with open(log_file, 'r') as f:
+                with open(log_file, 'rb') as f:
                     for line in f:
                         if len(events) >= limit:
                             break
                         
                         try:
-                            event = json.loads(line.strip())
+                            event = json_codec.loads(line)
                             
                             # Apply filters
                             if start_time and event.get('timestamp', 0) < start_time:
@@ -9,7 +9,7 @@ import threading
 import uuid
 import io
 import base64
-from typing import Optional, Dict, Any, List, Callable
+from typing import Optional, Dict, Any, List, Callable, Tuple
 from dataclasses import dataclass
 
 from ..storage.offline_queue import OfflineQueue, DetectionEventPayload
@@ -213,7 +213,11 @@ class UploadService:
         if not self.offline_queue:
             return
         
-        items = self.offline_queue.get_pending_items(limit=self.batch_size)
+        # Images are loaded per item during upload so a batch holds at most
+        # one image in memory at a time
+        items = self.offline_queue.get_pending_items(
+            limit=self.batch_size, include_images=False
+        )
         
         if not items:
             return
@@ -224,6 +228,7 @@ class UploadService:
         
         # Process each item
         successful = []
+        failures = []
         for item in items:
             result = self._upload_detection(item)
             
@@ -237,7 +242,7 @@ class UploadService:
                     )
             else:
                 self._upload_failed += 1
-                self.offline_queue.mark_failed(item['event_id'], result.error or "Unknown error")
+                failures.append((item['event_id'], result.error or "Unknown error"))
                 
                 if self.event_logger:
                     self.event_logger.log_upload_failed(
@@ -252,6 +257,10 @@ class UploadService:
             self.offline_queue.mark_completed(successful)
             self._last_upload_time = time.time()
             logger.info(f"Uploaded {len(successful)} detection events to portal")
+        
+        # Schedule retries for the whole batch at once
+        if failures:
+            self.offline_queue.mark_failed_many(failures)
     
     def _upload_detection(self, item: Dict[str, Any]) -> UploadResult:
         """Upload a single detection event."""
@@ -262,8 +271,14 @@ class UploadService:
         
         # Prepare image data
         image_base64 = None
-        if item.get('image_data'):
-            image_base64 = base64.b64encode(item['image_data']).decode('utf-8')
+        image_data = item.get('image_data')
+        if image_data is None and self.offline_queue and (
+            item.get('has_image') or item.get('image_file')
+        ):
+            image_data = self.offline_queue.get_image_data(event_id)
+        
+        if image_data:
+            image_base64 = base64.b64encode(image_data).decode('utf-8')
         elif item.get('image_path') and self.image_store:
             image_base64 = self.image_store.get_image_base64(
                 item['image_path'],
@@ -325,6 +340,63 @@ class UploadService:
         Returns:
             Event ID for tracking
         """
+        return self.queue_detections([{
+            "detection_id": detection_id,
+            "class_name": class_name,
+            "class_id": class_id,
+            "confidence": confidence,
+            "bbox": bbox,
+            "camera_id": camera_id,
+            "image_path": image_path,
+            "image_data": image_data,
+            "priority": priority,
+            "metadata": metadata
+        }])[0]
+    
+    def queue_detections(self, detections: List[Dict[str, Any]]) -> List[str]:
+        """
+        Queue several detection events for upload in one queue transaction.
+        
+        Args:
+            detections: queue_detection() keyword arguments, one dict per detection
+        
+        Returns:
+            Event IDs for tracking, in the same order
+        """
+        items = [self._make_queue_item(**detection) for detection in detections]
+        
+        if self.offline_queue:
+            self.offline_queue.enqueue_many(items)
+        
+        if self.event_logger:
+            for payload, _, _ in items:
+                self.event_logger.log_detection(
+                    event_id=payload.event_id,
+                    class_name=payload.class_name,
+                    confidence=payload.confidence,
+                    bbox=payload.bbox,
+                    camera_id=payload.camera_id,
+                    image_path=payload.image_path,
+                    location=self._location,
+                    metadata=payload.metadata or None
+                )
+        
+        return [payload.event_id for payload, _, _ in items]
+    
+    def _make_queue_item(
+        self,
+        detection_id: int,
+        class_name: str,
+        class_id: int,
+        confidence: float,
+        bbox: List[int],
+        camera_id: str,
+        image_path: Optional[str] = None,
+        image_data: Optional[bytes] = None,
+        priority: int = 0,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Tuple[DetectionEventPayload, int, Optional[bytes]]:
+        """Build the (payload, priority, image_data) tuple OfflineQueue.enqueue_many() takes."""
         event_id = f"det_{self.device_id}_{int(time.time() * 1000)}_{detection_id}"
         
         payload = DetectionEventPayload(
@@ -341,23 +413,7 @@ class UploadService:
             location=self._location,
             metadata=metadata or {}
         )
-        
-        if self.offline_queue:
-            self.offline_queue.enqueue(payload, priority=priority, image_data=image_data)
-        
-        if self.event_logger:
-            self.event_logger.log_detection(
-                event_id=event_id,
-                class_name=class_name,
-                confidence=confidence,
-                bbox=bbox,
-                camera_id=camera_id,
-                image_path=image_path,
-                location=self._location,
-                metadata=metadata
-            )
-        
-        return event_id
+        return payload, priority, image_data
     
     def upload_immediate(
         self,
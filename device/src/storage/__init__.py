@@ -2,7 +2,7 @@
 
 from .database import DetectionDatabase, DetectionRecord
 from .image_store import ImageStore
-from .offline_queue import OfflineQueue, DetectionEventPayload, QueueItemStatus
+from .offline_queue import OfflineQueue, DetectionEventPayload, QueueItem, QueueItemStatus
 
 __all__ = [
     'DetectionDatabase',
@@ -10,5 +10,6 @@ __all__ = [
     'ImageStore',
     'OfflineQueue',
     'DetectionEventPayload',
+    'QueueItem',
     'QueueItemStatus'
 ]
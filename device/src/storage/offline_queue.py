@@ -7,15 +7,126 @@ import logging
 import sqlite3
 import time
 import json
+import queue
+import shutil
 import threading
+import uuid
+from collections.abc import Mapping
+from concurrent.futures import Future
 from pathlib import Path
-from typing import Optional, List, Dict, Any
-from dataclasses import dataclass, asdict
+from typing import Optional, List, Dict, Any, Tuple, Callable
+from dataclasses import dataclass
 from contextlib import contextmanager
 from enum import Enum
 
+from ..utils import json_codec
+
 logger = logging.getLogger(__name__)
 
+SCHEMA_VERSION = 4
+
+
+# Hot-path statements are kept as constants so every call issues identical
+# SQL text and hits the connection's statement cache. Lists of event IDs are
+# bound as a single JSON array (text) expanded by json_each(), so the text
+# does not change with the list length.
+_SQL_EVENT_IDS = "SELECT value FROM json_each(?)"
+
+_SQL_COUNT_PENDING = "SELECT count FROM queue_counts WHERE status = 'pending'"
+
+_SQL_STATUS_COUNTS = "SELECT status, count FROM queue_counts"
+
+# Re-enqueueing an event that is already queued leaves its row and image
+# alone instead of deleting and rewriting them; it can only raise priority.
+_SQL_INSERT_EVENT = """
+    INSERT INTO detection_queue 
+    (event_id, device_id, camera_id, timestamp, class_name, class_id,
+     confidence, bbox, image_path, image_file, image_size, location, metadata,
+     status, priority, attempts, created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'pending', ?, 0, ?, ?)
+    ON CONFLICT(event_id) DO UPDATE 
+    SET priority = excluded.priority, updated_at = excluded.updated_at
+    WHERE excluded.priority > detection_queue.priority
+"""
+
+_SQL_INSERT_IMAGE = """
+    INSERT INTO image_cache 
+    (event_id, image_data, size_bytes, created_at)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(event_id) DO NOTHING
+"""
+
+_SQL_GET_PENDING_WITH_IMAGES = """
+    SELECT q.*, c.image_data 
+    FROM detection_queue q
+    LEFT JOIN image_cache c ON c.event_id = q.event_id
+    WHERE q.status = 'pending' 
+    AND (q.next_retry IS NULL OR q.next_retry <= ?)
+    ORDER BY q.priority DESC, q.created_at ASC
+    LIMIT ?
+"""
+
+# Flags rows with an inline image without reading the blob itself
+_SQL_GET_PENDING = """
+    SELECT q.*, c.event_id IS NOT NULL AS has_image 
+    FROM detection_queue q
+    LEFT JOIN image_cache c ON c.event_id = q.event_id
+    WHERE q.status = 'pending' 
+    AND (q.next_retry IS NULL OR q.next_retry <= ?)
+    ORDER BY q.priority DESC, q.created_at ASC
+    LIMIT ?
+"""
+
+_SQL_GET_IMAGE = """
+    SELECT c.image_data, q.image_file 
+    FROM detection_queue q
+    LEFT JOIN image_cache c ON c.event_id = q.event_id
+    WHERE q.event_id = ?
+"""
+
+_SQL_MARK_IN_PROGRESS = f"""
+    UPDATE detection_queue 
+    SET status = 'in_progress', updated_at = ?
+    WHERE event_id IN ({_SQL_EVENT_IDS})
+"""
+
+_SQL_DELETE_EVENTS = f"DELETE FROM detection_queue WHERE event_id IN ({_SQL_EVENT_IDS})"
+
+_SQL_DELETE_IMAGES = f"DELETE FROM image_cache WHERE event_id IN ({_SQL_EVENT_IDS})"
+
+# Counts the attempt and either schedules a retry with exponential backoff
+# or fails the item permanently, in one statement. SET expressions see the
+# pre-update attempts value.
+_SQL_MARK_FAILED = """
+    UPDATE detection_queue 
+    SET attempts = attempts + 1,
+        last_attempt = :now,
+        error_message = :error,
+        updated_at = :now,
+        status = CASE WHEN attempts + 1 >= :max_attempts THEN 'failed' ELSE 'pending' END,
+        next_retry = CASE WHEN attempts + 1 >= :max_attempts THEN next_retry
+                          ELSE :now + :backoff_base * (1 << attempts) END
+    WHERE event_id = :event_id
+"""
+
+# RETURNING needs SQLite 3.35+; older builds read the outcome back instead
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+_SQL_MARK_FAILED_RETURNING = _SQL_MARK_FAILED + " RETURNING status, attempts, next_retry"
+
+_SQL_FAILURE_OUTCOME = """
+    SELECT status, attempts, next_retry FROM detection_queue WHERE event_id = ?
+"""
+
+_SQL_FAILED_AMONG = f"""
+    SELECT event_id, attempts FROM detection_queue 
+    WHERE status = 'failed' AND event_id IN ({_SQL_EVENT_IDS})
+"""
+
+
+# Tells the writer thread to exit once everything queued before it is written
+_WRITER_STOP = object()
+
 
 class QueueItemStatus(Enum):
     PENDING = "pending"
@@ -41,13 +152,79 @@ class DetectionEventPayload:
     metadata: Dict[str, Any]
     
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        # Spelled out rather than asdict(), which deep-copies bbox, location
+        # and metadata on every call
+        return {
+            "event_id": self.event_id,
+            "device_id": self.device_id,
+            "camera_id": self.camera_id,
+            "timestamp": self.timestamp,
+            "class_name": self.class_name,
+            "class_id": self.class_id,
+            "confidence": self.confidence,
+            "bbox": self.bbox,
+            "image_path": self.image_path,
+            "image_base64": self.image_base64,
+            "location": self.location,
+            "metadata": self.metadata
+        }
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'DetectionEventPayload':
         return cls(**data)
 
 
+class QueueItem(Mapping):
+    """
+    Read-only view of a queued row, as returned by get_pending_items().
+    
+    Behaves like the dict it replaces, but the JSON columns (bbox, location,
+    metadata) are only decoded when first read, so callers that stop early
+    or only need a few fields skip the decode work.
+    """
+    
+    JSON_COLUMNS = frozenset(("bbox", "location", "metadata"))
+    
+    __slots__ = ("_row", "_values")
+    
+    def __init__(self, row: sqlite3.Row, **values):
+        self._row = row
+        self._values = values
+    
+    def __getitem__(self, key: str) -> Any:
+        if key in self._values:
+            return self._values[key]
+        
+        try:
+            value = self._row[key]
+        except IndexError:
+            raise KeyError(key) from None
+        
+        if key in self.JSON_COLUMNS:
+            value = self._values[key] = json_codec.loads(value)
+        return value
+    
+    def __iter__(self):
+        columns = self._row.keys()
+        yield from columns
+        yield from (key for key in self._values if key not in columns)
+    
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+    
+    def __repr__(self) -> str:
+        return f"QueueItem({dict(self)!r})"
+
+
+@dataclass
+class _WriteOp:
+    """A unit of work for the queue's writer thread."""
+    func: Callable[..., Any]
+    args: Tuple[Any, ...]
+    transactional: bool
+    future: Future
+
+
 class OfflineQueue:
     """
     Persistent queue for detection events with SQLite backing.
@@ -57,11 +234,24 @@ class OfflineQueue:
     - Persistent storage survives restarts
     - Automatic retry with exponential backoff
     - Priority-based processing
-    - Image data stored separately for efficiency
+    - Image data stored separately for efficiency; large images are
+      kept as files next to the database instead of inline BLOBs
+    - All writes go through one writer thread, which group-commits
+      concurrent writes; reads use a separate read-only connection
     """
     
     MAX_RETRY_ATTEMPTS = 5
     RETRY_BACKOFF_BASE = 60  # seconds
+    IN_PROGRESS_TIMEOUT = 600  # seconds before an in-flight item is requeued
+    FAILED_RETENTION_DAYS = 7
+    MAINTENANCE_INTERVAL = 30  # seconds
+    CHECKPOINT_INTERVAL = 60  # seconds
+    COMPACTION_INTERVAL = 3600  # seconds
+    VACUUM_PAGES = 1000
+    ANALYSIS_LIMIT = 400  # rows sampled per index by PRAGMA optimize
+    IMAGE_INLINE_THRESHOLD = 100_000  # bytes; larger images are stored as files
+    WRITE_BATCH_SIZE = 64  # max writes group-committed in one transaction
+    VACUUM_MB_PER_SECOND = 10  # rough full-VACUUM throughput on a Pi SD card
     
     def __init__(
         self,
@@ -72,16 +262,30 @@ class OfflineQueue:
         self.db_path = Path(db_path)
         self.max_queue_size = max_queue_size
         self.max_image_size_mb = max_image_size_mb
-        self._lock = threading.Lock()
+        self.image_dir = self.db_path.parent / "queue_images"
+        self._writer_lock = threading.Lock()
+        self._write_queue: queue.Queue = queue.Queue()
+        self._writer_thread: Optional[threading.Thread] = None
+        self._read_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._read_conn: Optional[sqlite3.Connection] = None
         self._initialized = False
+        self._stop_event = threading.Event()
+        self._maintenance_thread: Optional[threading.Thread] = None
+        self._last_compaction = 0.0
+        self._last_checkpoint = 0.0
     
     def initialize(self) -> bool:
         """Initialize the queue database."""
         try:
             self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self.image_dir.mkdir(parents=True, exist_ok=True)
             
-            with self._get_connection() as conn:
-                self._create_tables(conn)
+            self._write(self._create_tables, transactional=False)
+            
+            # Nothing can be in flight before we start, so requeue everything
+            # left in progress by a previous run.
+            self._maintenance_tick(stale_before=time.time())
             
             self._initialized = True
             logger.info(f"Offline queue initialized: {self.db_path}")
@@ -90,21 +294,291 @@ class OfflineQueue:
             logger.error(f"Failed to initialize offline queue: {e}")
             return False
     
-    @contextmanager
-    def _get_connection(self):
-        """Get database connection with proper settings."""
-        conn = sqlite3.connect(
-            str(self.db_path),
-            timeout=30.0,
-            isolation_level=None
+    def start(self):
+        """Start the background maintenance thread."""
+        self._stop_event.clear()
+        self._maintenance_thread = threading.Thread(
+            target=self._maintenance_loop,
+            name="OfflineQueueMaintenance",
+            daemon=True
         )
+        self._maintenance_thread.start()
+    
+    def stop(self):
+        """Stop the background maintenance thread."""
+        self._stop_event.set()
+        if self._maintenance_thread and self._maintenance_thread.is_alive():
+            self._maintenance_thread.join(timeout=5)
+    
+    def _maintenance_loop(self):
+        """Background loop running periodic queue maintenance."""
+        while not self._stop_event.wait(self.MAINTENANCE_INTERVAL):
+            try:
+                self._maintenance_tick()
+                
+                now = time.time()
+                if now - self._last_compaction >= self.COMPACTION_INTERVAL:
+                    self.maintain()
+                elif now - self._last_checkpoint >= self.CHECKPOINT_INTERVAL:
+                    self._checkpoint()
+            except Exception as e:
+                logger.error(f"Offline queue maintenance error: {e}")
+    
+    def maintain(self):
+        """
+        Compact the database and refresh query planner statistics.
+        
+        Run hourly by the maintenance thread; PRAGMA optimize only
+        re-analyzes tables whose contents have shifted since it last ran,
+        and analysis_limit bounds each analysis to a sample of the rows.
+        """
+        self._write(self._compact_op, True, transactional=False)
+        self._last_compaction = self._last_checkpoint = time.time()
+    
+    def _compact(self):
+        """Return free pages to the filesystem and truncate the WAL."""
+        self._write(self._compact_op, transactional=False)
+        self._last_compaction = self._last_checkpoint = time.time()
+    
+    def _checkpoint(self):
+        """
+        Checkpoint and truncate the WAL off the ingest path, so enqueue never
+        pays for an automatic checkpoint of a large WAL.
+        """
+        self._write(self._checkpoint_op, transactional=False)
+        self._last_checkpoint = time.time()
+    
+    def _compact_op(self, conn: sqlite3.Connection, optimize: bool = False):
+        # executescript steps the pragma to completion; execute() would only
+        # free a single page.
+        conn.executescript(f"PRAGMA incremental_vacuum({self.VACUUM_PAGES});")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        if optimize:
+            conn.execute(f"PRAGMA analysis_limit={self.ANALYSIS_LIMIT}")
+            conn.execute("PRAGMA optimize")
+    
+    @staticmethod
+    def _checkpoint_op(conn: sqlite3.Connection):
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    
+    def _maintenance_tick(self, stale_before: Optional[float] = None) -> Dict[str, int]:
+        """
+        Run one maintenance pass in a single write transaction.
+        
+        Requeues in-progress items that were never acknowledged, expires old
+        failed items and drops cached images whose queue entry is gone, so a
+        cycle costs one commit instead of one per chore.
+        """
+        now = time.time()
+        if stale_before is None:
+            stale_before = now - self.IN_PROGRESS_TIMEOUT
+        failed_cutoff = now - (self.FAILED_RETENTION_DAYS * 86400)
+        
+        recovered, expired, orphaned, expired_files = self._write(
+            self._maintenance_op, now, stale_before, failed_cutoff
+        )
+        self._unlink_image_files(expired_files)
+        
+        if recovered or expired or orphaned:
+            logger.info(
+                f"Offline queue maintenance: requeued {recovered}, "
+                f"expired {expired}, dropped {orphaned} orphaned images"
+            )
+        
+        return {"recovered": recovered, "expired": expired, "orphaned_images": orphaned}
+    
+    def _maintenance_op(
+        self,
+        conn: sqlite3.Connection,
+        now: float,
+        stale_before: float,
+        failed_cutoff: float
+    ) -> Tuple[int, int, int, List[str]]:
+        recovered = conn.execute("""
+            UPDATE detection_queue 
+            SET status = 'pending', updated_at = ?
+            WHERE status = 'in_progress' AND updated_at < ?
+        """, (now, stale_before)).rowcount
+        
+        expired_files = self._image_files(
+            conn, "status = 'failed' AND updated_at < ?", (failed_cutoff,)
+        )
+        expired = conn.execute("""
+            DELETE FROM detection_queue 
+            WHERE status = 'failed' AND updated_at < ?
+        """, (failed_cutoff,)).rowcount
+        
+        orphaned = conn.execute("""
+            DELETE FROM image_cache 
+            WHERE event_id NOT IN (SELECT event_id FROM detection_queue)
+        """).rowcount
+        
+        return recovered, expired, orphaned, expired_files
+    
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """Open a database connection with proper settings."""
+        if read_only:
+            conn = sqlite3.connect(
+                f"file:{self.db_path}?mode=ro",
+                uri=True,
+                timeout=30.0,
+                isolation_level=None,
+                check_same_thread=False,
+                cached_statements=256
+            )
+        else:
+            conn = sqlite3.connect(
+                str(self.db_path),
+                timeout=30.0,
+                isolation_level=None,
+                check_same_thread=False,
+                cached_statements=256
+            )
+            # Only take effect on a new database, so they must precede the WAL switch
+            conn.execute("PRAGMA page_size=8192")
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
         conn.row_factory = sqlite3.Row
-        conn.execute("PRAGMA journal_mode=WAL")
-        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA cache_size=-20000")
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+    
+    @contextmanager
+    def _get_connection(self):
+        """
+        Get the long-lived writer connection.
+        
+        Only the writer thread uses this connection; everything else submits
+        work to it through _write().
+        """
+        if self._conn is None:
+            self._conn = self._connect()
+        yield self._conn
+    
+    def _write(self, func: Callable[..., Any], *args, transactional: bool = True) -> Any:
+        """
+        Run func(conn, *args) on the writer thread and return its result.
+        
+        Transactional writes queued back to back are committed together, so
+        concurrent callers share one BEGIN IMMEDIATE/COMMIT instead of
+        contending for the write lock. func must not manage the transaction
+        itself; pass transactional=False for statements that cannot run
+        inside one (VACUUM, WAL checkpoints, schema setup).
+        
+        Raises:
+            Whatever func raised, or the error that aborted its batch
+        """
+        op = _WriteOp(func, args, transactional, Future())
+        
+        with self._writer_lock:
+            if self._writer_thread is None or not self._writer_thread.is_alive():
+                self._writer_thread = threading.Thread(
+                    target=self._writer_loop,
+                    name="OfflineQueueWriter",
+                    daemon=True
+                )
+                self._writer_thread.start()
+            self._write_queue.put(op)
+        
+        return op.future.result()
+    
+    def _writer_loop(self):
+        """Drain the write queue, batching contiguous transactional writes."""
+        op = self._write_queue.get()
+        while op is not _WRITER_STOP:
+            batch = [op]
+            op = None
+            while batch[-1].transactional and len(batch) < self.WRITE_BATCH_SIZE:
+                try:
+                    queued = self._write_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if queued is _WRITER_STOP or not queued.transactional:
+                    op = queued
+                    break
+                batch.append(queued)
+            
+            self._run_write_batch(batch)
+            
+            if op is None:
+                op = self._write_queue.get()
+    
+    def _run_write_batch(self, batch: List[_WriteOp]):
+        """
+        Run a batch of writes, committing transactional ones together.
+        
+        Each write runs under its own savepoint, so a failing write is rolled
+        back alone and the rest of the batch still commits. Results are only
+        handed back once the COMMIT has succeeded.
+        """
+        done = []
+        
         try:
-            yield conn
-        finally:
-            conn.close()
+            with self._get_connection() as conn:
+                if not batch[0].transactional:
+                    done.append((batch[0], batch[0].func(conn, *batch[0].args)))
+                else:
+                    conn.execute("BEGIN IMMEDIATE")
+                    try:
+                        self._run_in_savepoints(conn, batch, done)
+                        conn.execute("COMMIT")
+                    except Exception:
+                        conn.execute("ROLLBACK")
+                        raise
+        except Exception as e:
+            for op in batch:
+                if not op.future.done():
+                    op.future.set_exception(e)
+            return
+        
+        for op, result in done:
+            op.future.set_result(result)
+    
+    def _run_in_savepoints(self, conn: sqlite3.Connection, batch: List[_WriteOp], done: list):
+        """Run each write under its own savepoint, appending (op, result) to done."""
+        for op in batch:
+            conn.execute("SAVEPOINT write_op")
+            try:
+                result = op.func(conn, *op.args)
+            except Exception as e:
+                conn.execute("ROLLBACK TO write_op")
+                conn.execute("RELEASE write_op")
+                op.future.set_exception(e)
+            else:
+                conn.execute("RELEASE write_op")
+                done.append((op, result))
+    
+    @contextmanager
+    def _get_read_connection(self):
+        """
+        Get the long-lived read-only connection.
+        
+        Under WAL, reads on this connection run concurrently with the writer
+        instead of queueing behind the writer thread.
+        """
+        with self._read_lock:
+            if self._read_conn is None:
+                self._read_conn = self._connect(read_only=True)
+            yield self._read_conn
+    
+    def close(self):
+        """Write out queued writes, stop the writer thread and close the connections."""
+        with self._read_lock:
+            if self._read_conn is not None:
+                self._read_conn.close()
+                self._read_conn = None
+        
+        with self._writer_lock:
+            if self._writer_thread is not None:
+                self._write_queue.put(_WRITER_STOP)
+                self._writer_thread.join()
+                self._writer_thread = None
+            
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
     
     def _create_tables(self, conn: sqlite3.Connection):
         """Create queue tables."""
@@ -118,10 +592,12 @@ class OfflineQueue:
                 class_name TEXT NOT NULL,
                 class_id INTEGER NOT NULL,
                 confidence REAL NOT NULL,
-                bbox TEXT NOT NULL,
+                bbox BLOB NOT NULL,
                 image_path TEXT,
-                location TEXT NOT NULL,
-                metadata TEXT NOT NULL,
+                image_file TEXT,
+                image_size INTEGER,
+                location BLOB NOT NULL,
+                metadata BLOB NOT NULL,
                 status TEXT DEFAULT 'pending',
                 priority INTEGER DEFAULT 0,
                 attempts INTEGER DEFAULT 0,
@@ -142,9 +618,172 @@ class OfflineQueue:
             )
         """)
         
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_queue_status ON detection_queue(status)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_queue_priority ON detection_queue(priority DESC, created_at ASC)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_queue_next_retry ON detection_queue(next_retry)")
+        # Serves get_pending_items in index order: status seek, rows already
+        # sorted by priority/age, next_retry checked without a table lookup.
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_queue_pending_ready 
+            ON detection_queue(status, priority DESC, created_at ASC, next_retry)
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_queue_status_updated 
+            ON detection_queue(status, updated_at)
+        """)
+        
+        # Per-status row counts kept current by triggers, so the queue-full
+        # check and get_stats() read one row instead of counting an index range.
+        # Enqueue is an UPSERT rather than INSERT OR REPLACE, so every row that
+        # leaves the table goes through a plain DELETE and fires the trigger
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS queue_counts (
+                status TEXT PRIMARY KEY,
+                count INTEGER NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_queue_counts_insert
+            AFTER INSERT ON detection_queue
+            BEGIN
+                INSERT INTO queue_counts (status, count) VALUES (NEW.status, 1)
+                ON CONFLICT(status) DO UPDATE SET count = count + 1;
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_queue_counts_delete
+            AFTER DELETE ON detection_queue
+            BEGIN
+                UPDATE queue_counts SET count = count - 1 WHERE status = OLD.status;
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_queue_counts_update
+            AFTER UPDATE OF status ON detection_queue
+            WHEN OLD.status IS NOT NEW.status
+            BEGIN
+                UPDATE queue_counts SET count = count - 1 WHERE status = OLD.status;
+                INSERT INTO queue_counts (status, count) VALUES (NEW.status, 1)
+                ON CONFLICT(status) DO UPDATE SET count = count + 1;
+            END
+        """)
+        
+        self._migrate(conn)
+        self._enable_incremental_vacuum(conn)
+    
+    def _migrate(self, conn: sqlite3.Connection):
+        """Bring an existing queue database up to SCHEMA_VERSION."""
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+        
+        if version < 1:
+            # JSON columns used to be stored as TEXT
+            conn.execute("""
+                UPDATE detection_queue 
+                SET bbox = CAST(bbox AS BLOB),
+                    location = CAST(location AS BLOB),
+                    metadata = CAST(metadata AS BLOB)
+                WHERE typeof(bbox) = 'text'
+            """)
+        
+        if version < 2:
+            # Superseded by idx_queue_pending_ready and idx_queue_status_updated
+            conn.execute("DROP INDEX IF EXISTS idx_queue_status")
+            conn.execute("DROP INDEX IF EXISTS idx_queue_priority")
+            conn.execute("DROP INDEX IF EXISTS idx_queue_next_retry")
+        
+        if version < 3:
+            self._add_queue_column(conn, "image_file", "TEXT")
+            self._add_queue_column(conn, "image_size", "INTEGER")
+        
+        if version < 4:
+            # Seed queue_counts from rows written before the triggers existed
+            conn.execute("DELETE FROM queue_counts")
+            conn.execute("""
+                INSERT INTO queue_counts (status, count)
+                SELECT status, COUNT(*) FROM detection_queue GROUP BY status
+            """)
+        
+        conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+    
+    def _add_queue_column(self, conn: sqlite3.Connection, name: str, decl: str):
+        """Add a column to detection_queue unless it is already there."""
+        columns = {row['name'] for row in conn.execute("PRAGMA table_info(detection_queue)")}
+        if name not in columns:
+            conn.execute(f"ALTER TABLE detection_queue ADD COLUMN {name} {decl}")
+    
+    def _enable_incremental_vacuum(self, conn: sqlite3.Connection):
+        """
+        Switch an existing database to incremental auto-vacuum.
+        
+        auto_vacuum only takes effect on a new database; one created before
+        it was set needs a one-time VACUUM to switch, or the hourly
+        incremental_vacuum never frees anything. The VACUUM copies the whole
+        database, so it is postponed to a later start while free disk space
+        is short, and it runs with temp_store=FILE so the copy is not built
+        in RAM.
+        """
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+            return
+        
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        db_size = page_count * page_size
+        
+        # The temporary copy plus its WAL frames need about twice the database
+        free = shutil.disk_usage(self.db_path.parent).free
+        if free < 2 * db_size:
+            logger.warning(
+                f"Postponing offline queue auto-vacuum conversion: "
+                f"{free / 1048576:.0f} MB free, {2 * db_size / 1048576:.0f} MB needed"
+            )
+            return
+        
+        size_mb = db_size / 1048576
+        logger.info(
+            f"Converting {size_mb:.0f} MB offline queue to incremental auto-vacuum, "
+            f"expected to take about {size_mb / self.VACUUM_MB_PER_SECOND:.0f}s"
+        )
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("PRAGMA temp_store=FILE")
+        try:
+            conn.execute("VACUUM")
+        finally:
+            conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    
+    def _spill_image(self, event_id: str, image_data: bytes) -> str:
+        """
+        Write an image too large to keep inline and return its path.
+        
+        Every call gets a fresh file name, so spilling for an event that is
+        already queued never touches the file its existing row points at.
+        """
+        path = self.image_dir / f"{event_id}-{uuid.uuid4().hex}.bin"
+        path.write_bytes(image_data)
+        return str(path)
+    
+    def _read_image_file(self, path: str) -> Optional[bytes]:
+        """Read a spilled image, tolerating files that have gone missing."""
+        try:
+            return Path(path).read_bytes()
+        except OSError as e:
+            logger.warning(f"Failed to read queued image {path}: {e}")
+            return None
+    
+    def _image_files(self, conn: sqlite3.Connection, where: str, params) -> List[str]:
+        """Get spilled image paths for the queue rows matching a WHERE clause."""
+        rows = conn.execute(f"""
+            SELECT image_file FROM detection_queue 
+            WHERE image_file IS NOT NULL AND ({where})
+        """, params).fetchall()
+        return [row['image_file'] for row in rows]
+    
+    def _unlink_image_files(self, paths: List[str]):
+        """Remove spilled image files."""
+        for path in paths:
+            try:
+                Path(path).unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"Failed to remove queued image {path}: {e}")
     
     def enqueue(
         self,
@@ -163,184 +802,320 @@ class OfflineQueue:
         Returns:
             True if successfully queued
         """
-        with self._lock:
-            try:
-                with self._get_connection() as conn:
-                    # Check queue size
-                    count = conn.execute(
-                        "SELECT COUNT(*) FROM detection_queue WHERE status = 'pending'"
-                    ).fetchone()[0]
-                    
-                    if count >= self.max_queue_size:
-                        # Remove oldest low-priority items
-                        conn.execute("""
-                            DELETE FROM detection_queue 
-                            WHERE id IN (
-                                SELECT id FROM detection_queue 
-                                WHERE status = 'pending' AND priority <= 0
-                                ORDER BY created_at ASC 
-                                LIMIT 100
-                            )
-                        """)
-                        logger.warning("Queue full, removed oldest items")
-                    
-                    now = time.time()
-                    conn.execute("""
-                        INSERT OR REPLACE INTO detection_queue 
-                        (event_id, device_id, camera_id, timestamp, class_name, class_id,
-                         confidence, bbox, image_path, location, metadata, status,
-                         priority, attempts, created_at, updated_at)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'pending', ?, 0, ?, ?)
-                    """, (
-                        payload.event_id,
-                        payload.device_id,
-                        payload.camera_id,
-                        payload.timestamp,
-                        payload.class_name,
-                        payload.class_id,
-                        payload.confidence,
-                        json.dumps(payload.bbox),
-                        payload.image_path,
-                        json.dumps(payload.location),
-                        json.dumps(payload.metadata),
-                        priority,
-                        now,
-                        now
-                    ))
-                    
-                    # Store image data separately if provided
-                    if image_data:
-                        conn.execute("""
-                            INSERT OR REPLACE INTO image_cache 
-                            (event_id, image_data, size_bytes, created_at)
-                            VALUES (?, ?, ?, ?)
-                        """, (payload.event_id, image_data, len(image_data), now))
-                    
-                    logger.debug(f"Queued detection event: {payload.event_id}")
-                    return True
-                    
-            except Exception as e:
-                logger.error(f"Failed to enqueue detection: {e}")
-                return False
+        return self.enqueue_many([(payload, priority, image_data)])
     
-    def get_pending_items(self, limit: int = 10) -> List[Dict[str, Any]]:
-        """Get pending items ready for processing."""
-        items = []
+    def enqueue_many(
+        self,
+        items: List[Tuple[DetectionEventPayload, int, Optional[bytes]]]
+    ) -> bool:
+        """
+        Add a batch of detection events to the queue in one transaction.
+        
+        Args:
+            items: (payload, priority, image_data) tuples, as for enqueue()
+        
+        Returns:
+            True if the whole batch was queued
+        """
+        if not items:
+            return True
+        
         now = time.time()
+        rows = []
+        image_rows = []
+        spilled_files = []
+        spilled_ids = []
         
+        # Everything is encoded and written to disk here, on the caller's
+        # thread, so the writer thread only has to run the INSERTs
         try:
-            with self._get_connection() as conn:
-                rows = conn.execute("""
-                    SELECT * FROM detection_queue 
-                    WHERE status = 'pending' 
-                    AND (next_retry IS NULL OR next_retry <= ?)
-                    ORDER BY priority DESC, created_at ASC
-                    LIMIT ?
-                """, (now, limit)).fetchall()
+            for payload, priority, image_data in items:
+                # Store image data separately if provided, on disk when large
+                image_file = None
+                image_size = None
+                if image_data and len(image_data) > self.IMAGE_INLINE_THRESHOLD:
+                    image_file = self._spill_image(payload.event_id, image_data)
+                    image_size = len(image_data)
+                    spilled_files.append(image_file)
+                    spilled_ids.append(payload.event_id)
+                elif image_data:
+                    image_rows.append((payload.event_id, image_data, len(image_data), now))
                 
-                for row in rows:
-                    item = dict(row)
-                    item['bbox'] = json.loads(item['bbox'])
-                    item['location'] = json.loads(item['location'])
-                    item['metadata'] = json.loads(item['metadata'])
-                    
-                    # Get cached image if available
-                    image_row = conn.execute(
-                        "SELECT image_data FROM image_cache WHERE event_id = ?",
-                        (item['event_id'],)
-                    ).fetchone()
-                    item['image_data'] = image_row['image_data'] if image_row else None
-                    
-                    items.append(item)
+                rows.append((
+                    payload.event_id,
+                    payload.device_id,
+                    payload.camera_id,
+                    payload.timestamp,
+                    payload.class_name,
+                    payload.class_id,
+                    payload.confidence,
+                    json_codec.dumps(payload.bbox),
+                    payload.image_path,
+                    image_file,
+                    image_size,
+                    json_codec.dumps(payload.location),
+                    json_codec.dumps(payload.metadata),
+                    priority,
+                    now,
+                    now
+                ))
+            
+            unused_files = self._write(
+                self._enqueue_op,
+                rows,
+                image_rows,
+                json.dumps(spilled_ids) if spilled_ids else None
+            )
+            self._unlink_image_files(unused_files)
+            logger.debug(f"Queued {len(rows)} detection events")
+            return True
+            
+        except Exception as e:
+            self._unlink_image_files(spilled_files)
+            logger.error(f"Failed to enqueue detections: {e}")
+            return False
+    
+    def _enqueue_op(
+        self,
+        conn: sqlite3.Connection,
+        rows: List[tuple],
+        image_rows: List[tuple],
+        spilled_ids: Optional[str]
+    ) -> List[str]:
+        evicted_files = []
+        
+        # Check queue size
+        row = conn.execute(_SQL_COUNT_PENDING).fetchone()
+        count = row[0] if row else 0
+        
+        if count >= self.max_queue_size:
+            # Remove oldest low-priority items
+            evict_where = """
+                id IN (
+                    SELECT id FROM detection_queue 
+                    WHERE status = 'pending' AND priority <= 0
+                    ORDER BY created_at ASC 
+                    LIMIT 100
+                )
+            """
+            evicted_files = self._image_files(conn, evict_where, ())
+            conn.execute(f"DELETE FROM detection_queue WHERE {evict_where}")
+            logger.warning("Queue full, removed oldest items")
+        
+        conn.executemany(_SQL_INSERT_EVENT, rows)
+        
+        if image_rows:
+            conn.executemany(_SQL_INSERT_IMAGE, image_rows)
+        
+        unused_files = evicted_files
+        if spilled_ids:
+            # An event that was already queued keeps its row and its file, so
+            # a file just written for it is dropped unless the insert took it
+            kept = set(self._image_files(conn, f"event_id IN ({_SQL_EVENT_IDS})", (spilled_ids,)))
+            unused_files += [row[9] for row in rows if row[9] and row[9] not in kept]
+        
+        return unused_files
+    
+    def get_pending_items(
+        self,
+        limit: int = 10,
+        include_images: bool = True
+    ) -> List[QueueItem]:
+        """
+        Get pending items ready for processing.
+        
+        Args:
+            limit: Maximum number of items to return
+            include_images: Attach image bytes as 'image_data'. Pass False to
+                keep a batch light; items then carry 'has_image' instead, and
+                get_image_data() loads an image only for items that have one
+                inline ('has_image') or on disk ('image_file').
+        
+        Returns:
+            Read-only QueueItem mappings; JSON fields decode on first access
+        """
+        items = []
+        now = time.time()
+        
+        query = _SQL_GET_PENDING_WITH_IMAGES if include_images else _SQL_GET_PENDING
+        
+        try:
+            with self._get_read_connection() as conn:
+                rows = conn.execute(query, (now, limit)).fetchall()
+            
+            for row in rows:
+                if include_images and row['image_data'] is None and row['image_file']:
+                    items.append(QueueItem(row, image_data=self._read_image_file(row['image_file'])))
+                else:
+                    items.append(QueueItem(row))
                     
         except Exception as e:
             logger.error(f"Failed to get pending items: {e}")
         
         return items
     
+    def get_image_data(self, event_id: str) -> Optional[bytes]:
+        """Get the queued image for a single event, if any."""
+        try:
+            with self._get_read_connection() as conn:
+                row = conn.execute(_SQL_GET_IMAGE, (event_id,)).fetchone()
+        except Exception as e:
+            logger.error(f"Failed to get image for {event_id}: {e}")
+            return None
+        
+        if not row:
+            return None
+        if row['image_data'] is not None:
+            return row['image_data']
+        if row['image_file']:
+            return self._read_image_file(row['image_file'])
+        return None
+    
     def mark_in_progress(self, event_ids: List[str]):
         """Mark items as being processed."""
         if not event_ids:
             return
         
-        with self._lock:
-            try:
-                with self._get_connection() as conn:
-                    placeholders = ",".join("?" * len(event_ids))
-                    conn.execute(f"""
-                        UPDATE detection_queue 
-                        SET status = 'in_progress', updated_at = ?
-                        WHERE event_id IN ({placeholders})
-                    """, [time.time()] + event_ids)
-            except Exception as e:
-                logger.error(f"Failed to mark items in progress: {e}")
+        try:
+            self._write(self._execute_op, _SQL_MARK_IN_PROGRESS, (time.time(), json.dumps(event_ids)))
+        except Exception as e:
+            logger.error(f"Failed to mark items in progress: {e}")
     
     def mark_completed(self, event_ids: List[str]):
         """Mark items as successfully uploaded."""
         if not event_ids:
             return
         
-        with self._lock:
-            try:
-                with self._get_connection() as conn:
-                    placeholders = ",".join("?" * len(event_ids))
-                    
-                    # Delete from queue
-                    conn.execute(f"""
-                        DELETE FROM detection_queue 
-                        WHERE event_id IN ({placeholders})
-                    """, event_ids)
-                    
-                    # Delete cached images
-                    conn.execute(f"""
-                        DELETE FROM image_cache 
-                        WHERE event_id IN ({placeholders})
-                    """, event_ids)
-                    
-                    logger.debug(f"Completed {len(event_ids)} detection events")
-            except Exception as e:
-                logger.error(f"Failed to mark items completed: {e}")
+        try:
+            image_files = self._write(self._complete_op, (json.dumps(event_ids),))
+            self._unlink_image_files(image_files)
+            logger.debug(f"Completed {len(event_ids)} detection events")
+        except Exception as e:
+            logger.error(f"Failed to mark items completed: {e}")
+    
+    def _complete_op(self, conn: sqlite3.Connection, ids: tuple) -> List[str]:
+        image_files = self._image_files(conn, f"event_id IN ({_SQL_EVENT_IDS})", ids)
+        
+        # Delete from queue
+        conn.execute(_SQL_DELETE_EVENTS, ids)
+        
+        # Delete cached images
+        conn.execute(_SQL_DELETE_IMAGES, ids)
+        
+        return image_files
     
     def mark_failed(self, event_id: str, error_message: str):
         """Mark item as failed with retry scheduling."""
-        with self._lock:
-            try:
-                with self._get_connection() as conn:
-                    row = conn.execute(
-                        "SELECT attempts FROM detection_queue WHERE event_id = ?",
-                        (event_id,)
-                    ).fetchone()
-                    
-                    if not row:
-                        return
-                    
-                    attempts = row['attempts'] + 1
-                    now = time.time()
-                    
-                    if attempts >= self.MAX_RETRY_ATTEMPTS:
-                        # Move to failed status permanently
-                        conn.execute("""
-                            UPDATE detection_queue 
-                            SET status = 'failed', attempts = ?, last_attempt = ?,
-                                error_message = ?, updated_at = ?
-                            WHERE event_id = ?
-                        """, (attempts, now, error_message, now, event_id))
-                        logger.warning(f"Detection {event_id} permanently failed after {attempts} attempts")
-                    else:
-                        # Schedule retry with exponential backoff
-                        backoff = self.RETRY_BACKOFF_BASE * (2 ** (attempts - 1))
-                        next_retry = now + backoff
-                        
-                        conn.execute("""
-                            UPDATE detection_queue 
-                            SET status = 'pending', attempts = ?, last_attempt = ?,
-                                next_retry = ?, error_message = ?, updated_at = ?
-                            WHERE event_id = ?
-                        """, (attempts, now, next_retry, error_message, now, event_id))
-                        logger.debug(f"Detection {event_id} scheduled for retry in {backoff}s")
-                        
-            except Exception as e:
-                logger.error(f"Failed to mark item failed: {e}")
+        now = time.time()
+        params = {
+            "event_id": event_id,
+            "error": error_message,
+            "now": now,
+            "max_attempts": self.MAX_RETRY_ATTEMPTS,
+            "backoff_base": self.RETRY_BACKOFF_BASE
+        }
+        
+        try:
+            row = self._write(self._mark_failed_op, params)
+        except Exception as e:
+            logger.error(f"Failed to mark item failed: {e}")
+            return
+        
+        if not row:
+            return
+        
+        if row['status'] == 'failed':
+            logger.warning(f"Detection {event_id} permanently failed after {row['attempts']} attempts")
+        else:
+            logger.debug(f"Detection {event_id} scheduled for retry in {row['next_retry'] - now:.0f}s")
+    
+    @staticmethod
+    def _mark_failed_op(conn: sqlite3.Connection, params: Dict[str, Any]) -> Optional[sqlite3.Row]:
+        # fetchall() steps the statement to completion before its savepoint is released
+        if _HAS_RETURNING:
+            rows = conn.execute(_SQL_MARK_FAILED_RETURNING, params).fetchall()
+        else:
+            conn.execute(_SQL_MARK_FAILED, params)
+            rows = conn.execute(_SQL_FAILURE_OUTCOME, (params["event_id"],)).fetchall()
+        return rows[0] if rows else None
+    
+    def mark_failed_many(self, failures: List[Tuple[str, str]]):
+        """
+        Mark a batch of items as failed in one transaction.
+        
+        Args:
+            failures: (event_id, error_message) tuples, as for mark_failed()
+        """
+        if not failures:
+            return
+        
+        now = time.time()
+        params = [
+            {
+                "event_id": event_id,
+                "error": error_message,
+                "now": now,
+                "max_attempts": self.MAX_RETRY_ATTEMPTS,
+                "backoff_base": self.RETRY_BACKOFF_BASE
+            }
+            for event_id, error_message in failures
+        ]
+        event_ids = json.dumps([event_id for event_id, _ in failures])
+        
+        try:
+            exhausted = self._write(self._mark_failed_many_op, params, event_ids)
+        except Exception as e:
+            logger.error(f"Failed to mark items failed: {e}")
+            return
+        
+        for row in exhausted:
+            logger.warning(
+                f"Detection {row['event_id']} permanently failed after {row['attempts']} attempts"
+            )
+        logger.debug(f"Marked {len(failures)} detection events failed")
+    
+    @staticmethod
+    def _mark_failed_many_op(
+        conn: sqlite3.Connection,
+        params: List[Dict[str, Any]],
+        event_ids: str
+    ) -> List[sqlite3.Row]:
+        conn.executemany(_SQL_MARK_FAILED, params)
+        return conn.execute(_SQL_FAILED_AMONG, (event_ids,)).fetchall()
+    
+    def requeue_failed(self, limit: int = 1000) -> int:
+        """
+        Move permanently failed items back to pending in one statement.
+        
+        Oldest failures go first, each with a fresh retry budget. Nothing
+        in the service calls this yet; it is for replaying the failed
+        backlog by hand, e.g. after a long outage.
+        
+        Returns:
+            Number of items requeued
+        """
+        requeued = 0
+        
+        try:
+            requeued = self._write(self._execute_op, """
+                UPDATE detection_queue 
+                SET status = 'pending', attempts = 0, next_retry = NULL,
+                    error_message = NULL, updated_at = ?
+                WHERE id IN (
+                    SELECT id FROM detection_queue 
+                    WHERE status = 'failed'
+                    ORDER BY updated_at ASC 
+                    LIMIT ?
+                )
+            """, (time.time(), limit))
+            
+            if requeued > 0:
+                logger.info(f"Requeued {requeued} failed detection events")
+                
+        except Exception as e:
+            logger.error(f"Failed to requeue failed items: {e}")
+        
+        return requeued
     
     def get_stats(self) -> Dict[str, Any]:
         """Get queue statistics."""
@@ -354,17 +1129,16 @@ class OfflineQueue:
         }
         
         try:
-            with self._get_connection() as conn:
-                for status in ['pending', 'in_progress', 'failed']:
-                    count = conn.execute(
-                        "SELECT COUNT(*) FROM detection_queue WHERE status = ?",
-                        (status,)
-                    ).fetchone()[0]
-                    stats[status] = count
+            with self._get_read_connection() as conn:
+                for row in conn.execute(_SQL_STATUS_COUNTS):
+                    if row['status'] in stats:
+                        stats[row['status']] = row['count']
                 
-                cache_size = conn.execute(
-                    "SELECT COALESCE(SUM(size_bytes), 0) FROM image_cache"
-                ).fetchone()[0]
+                # Inline images plus the ones spilled to queue_images/
+                cache_size = conn.execute("""
+                    SELECT (SELECT COALESCE(SUM(size_bytes), 0) FROM image_cache)
+                         + (SELECT COALESCE(SUM(image_size), 0) FROM detection_queue)
+                """).fetchone()[0]
                 stats["image_cache_mb"] = round(cache_size / (1024 * 1024), 2)
                 
         except Exception as e:
@@ -377,27 +1151,45 @@ class OfflineQueue:
         cutoff = time.time() - (days * 86400)
         deleted = 0
         
-        with self._lock:
-            try:
-                with self._get_connection() as conn:
-                    # Get event IDs to delete
-                    rows = conn.execute("""
-                        SELECT event_id FROM detection_queue 
-                        WHERE status = 'failed' AND updated_at < ?
-                    """, (cutoff,)).fetchall()
-                    
-                    event_ids = [row['event_id'] for row in rows]
-                    
-                    if event_ids:
-                        placeholders = ",".join("?" * len(event_ids))
-                        conn.execute(f"DELETE FROM detection_queue WHERE event_id IN ({placeholders})", event_ids)
-                        conn.execute(f"DELETE FROM image_cache WHERE event_id IN ({placeholders})", event_ids)
-                        deleted = len(event_ids)
-                        
-                    if deleted > 0:
-                        logger.info(f"Cleaned up {deleted} old failed detection events")
-                        
-            except Exception as e:
-                logger.error(f"Failed to cleanup old failed items: {e}")
+        try:
+            rows = self._write(self._cleanup_failed_op, cutoff)
+            deleted = len(rows)
+            self._unlink_image_files([row['image_file'] for row in rows if row['image_file']])
+            
+            if deleted > 0:
+                logger.info(f"Cleaned up {deleted} old failed detection events")
+                # Hand the freed pages back and keep the WAL from growing
+                self._compact()
+                
+        except Exception as e:
+            logger.error(f"Failed to cleanup old failed items: {e}")
         
         return deleted
+    
+    @staticmethod
+    def _cleanup_failed_op(conn: sqlite3.Connection, cutoff: float) -> List[sqlite3.Row]:
+        # Get event IDs to delete
+        rows = conn.execute("""
+            SELECT event_id, image_file FROM detection_queue 
+            WHERE status = 'failed' AND updated_at < ?
+        """, (cutoff,)).fetchall()
+        
+        if rows:
+            # Delete by the same predicate, within the same transaction,
+            # rather than encoding the ID list on the writer thread
+            conn.execute("""
+                DELETE FROM image_cache WHERE event_id IN (
+                    SELECT event_id FROM detection_queue 
+                    WHERE status = 'failed' AND updated_at < ?
+                )
+            """, (cutoff,))
+            conn.execute("""
+                DELETE FROM detection_queue 
+                WHERE status = 'failed' AND updated_at < ?
+            """, (cutoff,))
+        
+        return rows
+    
+    @staticmethod
+    def _execute_op(conn: sqlite3.Connection, sql: str, params) -> int:
+        return conn.execute(sql, params).rowcount
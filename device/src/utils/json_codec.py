@@ -0,0 +1,41 @@
+"""
+JSON encoding shared by the offline queue and the event logger.
+Uses orjson when it is installed and falls back to the stdlib json module.
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(value: Any, newline: bool = False) -> bytes:
+    """
+    Serialize a value to UTF-8 JSON bytes.
+
+    Args:
+        value: Value to serialize; non-string dict keys are converted
+        newline: Append a trailing newline, as for a JSONL record
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if newline:
+            option |= orjson.OPT_APPEND_NEWLINE
+        return orjson.dumps(value, option=option)
+    data = json.dumps(value).encode()
+    return data + b"\n" if newline else data
+
+
+def loads(data: Any) -> Any:
+    """
+    Deserialize JSON from bytes or str.
+
+    Raises:
+        json.JSONDecodeError: If data is not valid JSON
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
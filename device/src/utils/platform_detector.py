@@ -4,10 +4,14 @@ Automatically detects OS type, user groups, paths, and hardware capabilities.
 """
 
 import os
+import re
 import sys
 import platform
+import shutil
 import subprocess
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field
@@ -15,6 +19,15 @@ from enum import Enum
 
 logger = logging.getLogger(__name__)
 
+# vcgencmd queries used by hardware detection, run together in one shell
+_VCGENCMD_QUERIES = ("get_camera", "get_mem gpu")
+
+# vcgencmd get_camera: "supported=1 detected=1, libcamera interfaces=0"
+_CAMERA_STATUS_RE = re.compile(r"supported=(\d+) detected=(\d+)")
+
+# KEY=value assignments in /etc/os-release
+_OS_RELEASE_RE = re.compile(r"^([A-Z0-9_]+)=(.*)$", re.MULTILINE)
+
 
 class OSType(Enum):
     """Supported operating system types."""
@@ -145,10 +158,15 @@ class PlatformDetector:
     def __init__(self, base_path: Optional[Path] = None):
         self.base_path = base_path or Path(__file__).parent.parent.parent
         self._os_type: Optional[OSType] = None
+        self._architecture: Optional[Architecture] = None
+        self._os_release: Optional[Dict[str, str]] = None
         self._user_info: Optional[UserInfo] = None
         self._system_info: Optional[SystemInfo] = None
         self._path_info: Optional[PathInfo] = None
         self._hardware: Optional[HardwareCapabilities] = None
+        self._vcgencmd_output: Optional[Dict[str, str]] = None
+        self._vcgencmd_lock = threading.Lock()
+        self._dev_names: Optional[List[str]] = None
 
     # -------------------------------------------------------------------------
     # OS Detection
@@ -179,20 +197,21 @@ class PlatformDetector:
 
     def _is_raspberry_pi(self) -> bool:
         """Check if running on a Raspberry Pi."""
-        # Check /proc/cpuinfo for Raspberry Pi
+        # Check /proc/device-tree/model first; it is a few bytes, whereas
+        # /proc/cpuinfo repeats a block per core
         try:
-            with open("/proc/cpuinfo", "r") as f:
-                cpuinfo = f.read().lower()
-                if "raspberry pi" in cpuinfo or "bcm" in cpuinfo:
+            with open("/proc/device-tree/model", "r") as f:
+                model = f.read().lower()
+                if "raspberry pi" in model:
                     return True
         except (FileNotFoundError, PermissionError):
             pass
 
-        # Check /proc/device-tree/model
+        # Check /proc/cpuinfo for Raspberry Pi
         try:
-            with open("/proc/device-tree/model", "r") as f:
-                model = f.read().lower()
-                if "raspberry pi" in model:
+            with open("/proc/cpuinfo", "r") as f:
+                cpuinfo = f.read().lower()
+                if "raspberry pi" in cpuinfo or "bcm" in cpuinfo:
                     return True
         except (FileNotFoundError, PermissionError):
             pass
@@ -211,18 +230,23 @@ class PlatformDetector:
 
     def get_architecture(self) -> Architecture:
         """Detect CPU architecture."""
+        if self._architecture is not None:
+            return self._architecture
+
         machine = platform.machine().lower()
 
         if machine in ("aarch64", "arm64"):
-            return Architecture.ARM64
+            self._architecture = Architecture.ARM64
         elif machine.startswith("arm"):
-            return Architecture.ARM32
+            self._architecture = Architecture.ARM32
         elif machine in ("x86_64", "amd64"):
-            return Architecture.X86_64
+            self._architecture = Architecture.X86_64
         elif machine in ("i386", "i686", "x86"):
-            return Architecture.X86
+            self._architecture = Architecture.X86
         else:
-            return Architecture.UNKNOWN
+            self._architecture = Architecture.UNKNOWN
+
+        return self._architecture
 
     # -------------------------------------------------------------------------
     # User Detection
@@ -360,21 +384,30 @@ class PlatformDetector:
 
     def _get_linux_distro_info(self) -> tuple:
         """Get Linux distribution name and version."""
-        try:
-            with open("/etc/os-release", "r") as f:
-                lines = f.readlines()
+        info = self._get_os_release()
+        if not info:
+            return "Linux", ""
 
-            info = {}
-            for line in lines:
-                if "=" in line:
-                    key, value = line.strip().split("=", 1)
-                    info[key] = value.strip('"')
+        name = info.get("PRETTY_NAME", info.get("NAME", "Linux"))
+        version = info.get("VERSION_ID", "")
+        return name, version
 
-            name = info.get("PRETTY_NAME", info.get("NAME", "Linux"))
-            version = info.get("VERSION_ID", "")
-            return name, version
+    def _get_os_release(self) -> Dict[str, str]:
+        """Parse /etc/os-release once, keeping every field."""
+        if self._os_release is not None:
+            return self._os_release
+
+        try:
+            with open("/etc/os-release", "r") as f:
+                content = f.read()
+            self._os_release = {
+                key: value.strip().strip("\"'")
+                for key, value in _OS_RELEASE_RE.findall(content)
+            }
         except Exception:
-            return "Linux", ""
+            self._os_release = {}
+
+        return self._os_release
 
     def _get_memory_gb(self) -> float:
         """Get total system memory in GB."""
@@ -458,29 +491,38 @@ class PlatformDetector:
         if self._hardware is not None:
             return self._hardware
 
-        self._hardware = HardwareCapabilities(
-            has_camera=self._detect_camera(),
-            camera_type=self._detect_camera_type(),
-            has_gpio=self._detect_gpio(),
-            has_i2c=self._detect_i2c(),
-            has_spi=self._detect_spi(),
-            can_run_ncnn=self._can_run_ncnn(),
-            gpu_available=self._detect_gpu(),
-        )
+        # Resolve shared lookups up front so the probe threads use the cached values
+        self.get_os_type()
+        self._list_dev()
 
-        return self._hardware
+        # The camera and GPU probes spawn processes (libcamera-hello,
+        # vcgencmd) or import heavy modules (cv2, torch), so they run side
+        # by side while the cheap device-node checks run here.
+        with ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="HardwareDetect"
+        ) as pool:
+            camera_future = pool.submit(self._detect_camera_type)
+            gpu_future = pool.submit(self._detect_gpu)
 
-    def _detect_camera(self) -> bool:
-        """Check if any camera is available."""
-        # Check for Pi Camera
-        if self._detect_pi_camera():
-            return True
+            has_gpio = self._detect_gpio()
+            has_i2c = self._detect_i2c()
+            has_spi = self._detect_spi()
+            can_run_ncnn = self._can_run_ncnn()
 
-        # Check for USB cameras
-        if self._detect_usb_camera():
-            return True
+            camera_type = camera_future.result()
+            gpu_available = gpu_future.result()
 
-        return False
+        self._hardware = HardwareCapabilities(
+            has_camera=camera_type is not None,
+            camera_type=camera_type,
+            has_gpio=has_gpio,
+            has_i2c=has_i2c,
+            has_spi=has_spi,
+            can_run_ncnn=can_run_ncnn,
+            gpu_available=gpu_available,
+        )
+
+        return self._hardware
 
     def _detect_camera_type(self) -> Optional[str]:
         """Detect the type of camera available."""
@@ -509,24 +551,13 @@ class PlatformDetector:
             pass
 
         # Check legacy camera interface
-        try:
-            result = subprocess.run(
-                ["vcgencmd", "get_camera"], capture_output=True, text=True, timeout=5
-            )
-            if result.returncode == 0 and "detected=1" in result.stdout:
-                return True
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            pass
-
-        return False
+        match = _CAMERA_STATUS_RE.match(self._query_vcgencmd().get("get_camera", ""))
+        return bool(match) and int(match.group(2)) > 0
 
     def _detect_usb_camera(self) -> bool:
         """Check if USB camera is available."""
         # Check /dev/video* devices
-        import glob
-
-        video_devices = glob.glob("/dev/video*")
-        if video_devices:
+        if self._has_dev_node("video"):
             return True
 
         # Try OpenCV
@@ -552,24 +583,29 @@ class PlatformDetector:
             return True
 
         # Check for gpiochip
-        import glob
-
-        if glob.glob("/dev/gpiochip*"):
-            return True
-
-        return False
+        return self._has_dev_node("gpiochip")
 
     def _detect_i2c(self) -> bool:
         """Check if I2C is available."""
-        import glob
-
-        return bool(glob.glob("/dev/i2c-*"))
+        return self._has_dev_node("i2c-")
 
     def _detect_spi(self) -> bool:
         """Check if SPI is available."""
-        import glob
+        return self._has_dev_node("spidev")
+
+    def _list_dev(self) -> List[str]:
+        """List /dev once; the device-node checks all match against it."""
+        if self._dev_names is None:
+            try:
+                with os.scandir("/dev") as entries:
+                    self._dev_names = [entry.name for entry in entries]
+            except OSError:
+                self._dev_names = []
+        return self._dev_names
 
-        return bool(glob.glob("/dev/spidev*"))
+    def _has_dev_node(self, prefix: str) -> bool:
+        """Check for a /dev entry whose name starts with prefix."""
+        return any(name.startswith(prefix) for name in self._list_dev())
 
     def _can_run_ncnn(self) -> bool:
         """Check if NCNN can run on this platform."""
@@ -582,16 +618,8 @@ class PlatformDetector:
 
         if os_type == OSType.RASPBERRY_PI:
             # Check VideoCore
-            try:
-                result = subprocess.run(
-                    ["vcgencmd", "get_mem", "gpu"],
-                    capture_output=True,
-                    text=True,
-                    timeout=5,
-                )
-                return result.returncode == 0
-            except Exception:
-                pass
+            if "get_mem gpu" in self._query_vcgencmd():
+                return True
 
         # Check for CUDA
         try:
@@ -603,6 +631,42 @@ class PlatformDetector:
 
         return False
 
+    def _query_vcgencmd(self) -> Dict[str, str]:
+        """
+        Run all vcgencmd queries in a single shell invocation.
+
+        Returns output keyed by query; queries that failed are left out.
+        The result is cached, so detection forks at most once for vcgencmd
+        even when the camera and GPU probes ask for it concurrently.
+        """
+        with self._vcgencmd_lock:
+            if self._vcgencmd_output is not None:
+                return self._vcgencmd_output
+
+            output_by_query = {}
+            # Without vcgencmd on PATH every query fails; skip the shell fork
+            if shutil.which("vcgencmd") is None:
+                self._vcgencmd_output = output_by_query
+                return self._vcgencmd_output
+
+            script = "; ".join(
+                f'out=$(vcgencmd {query}) && echo "{query}|$out"'
+                for query in _VCGENCMD_QUERIES
+            )
+            try:
+                result = subprocess.run(
+                    ["sh", "-c", script], capture_output=True, text=True, timeout=5
+                )
+                for line in result.stdout.splitlines():
+                    query, sep, output = line.partition("|")
+                    if sep and query in _VCGENCMD_QUERIES:
+                        output_by_query[query] = output.strip()
+            except (subprocess.TimeoutExpired, OSError):
+                pass
+
+            self._vcgencmd_output = output_by_query
+            return self._vcgencmd_output
+
     def has_camera(self) -> bool:
         """Check if camera is available."""
         return self.get_hardware_capabilities().has_camera
@@ -7,10 +7,11 @@ Supports Raspberry Pi, Linux, and macOS (for development).
 import logging
 import os
 import platform
+import re
 import subprocess
 import time
 import threading
-from typing import Dict, Any, Optional, Callable
+from typing import Dict, Any, Optional, Callable, Tuple
 from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
@@ -20,6 +21,29 @@ IS_LINUX = platform.system() == "Linux"
 IS_MACOS = platform.system() == "Darwin"
 IS_WINDOWS = platform.system() == "Windows"
 
+# The only /proc/meminfo fields the monitor uses (values in kB)
+_MEMINFO_RE = re.compile(rb"^(MemTotal|MemAvailable):\s+(\d+)", re.MULTILINE)
+
+# macOS: "CPU usage: 5.26% user, 10.52% sys, 84.21% idle" from top
+_TOP_IDLE_RE = re.compile(r"CPU usage:.*?([\d.]+)% idle")
+# macOS: vm_stat header and the page counts used for available memory
+_VM_STAT_PAGE_SIZE_RE = re.compile(r"page size of (\d+) bytes")
+_VM_STAT_PAGES_RE = re.compile(r"^Pages (free|inactive):\s+(\d+)", re.MULTILINE)
+
+
+def _read_small(path: str, size: int = 4096) -> bytes:
+    """
+    Read the head of a small /proc or /sys file.
+
+    One os.read() on a raw descriptor, without the buffered/text file
+    objects open() builds, which dominate the cost for files this size.
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        return os.read(fd, size)
+    finally:
+        os.close(fd)
+
 
 @dataclass
 class SystemStats:
@@ -58,6 +82,12 @@ class SystemMonitor:
         self._alert_callbacks: list = []
         self._start_time = time.time()
 
+        # Baseline for the CPU usage delta, so the first sample is real
+        # instead of 0.0
+        self._last_cpu: Optional[Tuple[int, int]] = (
+            self._read_cpu_times() if IS_LINUX else None
+        )
+
     def start(self):
         """Start background monitoring."""
         self._stop_event.clear()
@@ -119,46 +149,42 @@ class SystemMonitor:
         else:
             return 0.0
 
-    def _get_cpu_percent_linux(self) -> float:
-        """Get CPU usage on Linux via /proc/stat."""
+    def _read_cpu_times(self) -> Optional[Tuple[int, int]]:
+        """Read (idle, total) CPU jiffies from /proc/stat."""
         try:
-            with open("/proc/stat", "r") as f:
-                line = f.readline()
-                fields = line.split()
-                idle = int(fields[4])
-                total = sum(int(x) for x in fields[1:])
-
-                if not hasattr(self, "_last_cpu"):
-                    self._last_cpu = (idle, total)
-                    return 0.0
+            # The aggregate "cpu" line comes first
+            fields = _read_small("/proc/stat").split(b"\n", 1)[0].split()
+            return int(fields[4]), sum(int(x) for x in fields[1:])
+        except Exception:
+            return None
 
-                last_idle, last_total = self._last_cpu
-                idle_delta = idle - last_idle
-                total_delta = total - last_total
+    def _get_cpu_percent_linux(self) -> float:
+        """Get CPU usage on Linux via /proc/stat."""
+        cpu_times = self._read_cpu_times()
+        if cpu_times is None:
+            return 0.0
 
-                self._last_cpu = (idle, total)
+        last_cpu, self._last_cpu = self._last_cpu, cpu_times
+        if last_cpu is None:
+            return 0.0
 
-                if total_delta == 0:
-                    return 0.0
+        idle_delta = cpu_times[0] - last_cpu[0]
+        total_delta = cpu_times[1] - last_cpu[1]
 
-                return round((1 - idle_delta / total_delta) * 100, 1)
-        except Exception:
+        if total_delta == 0:
             return 0.0
 
+        return round((1 - idle_delta / total_delta) * 100, 1)
+
     def _get_cpu_percent_macos(self) -> float:
         """Get CPU usage on macOS via top command."""
         try:
             result = subprocess.run(
                 ["top", "-l", "1", "-n", "0"], capture_output=True, text=True, timeout=5
             )
-            for line in result.stdout.split("\n"):
-                if "CPU usage" in line:
-                    # Parse: "CPU usage: 5.26% user, 10.52% sys, 84.21% idle"
-                    parts = line.split(",")
-                    for part in parts:
-                        if "idle" in part:
-                            idle = float(part.split("%")[0].strip().split()[-1])
-                            return round(100 - idle, 1)
+            match = _TOP_IDLE_RE.search(result.stdout)
+            if match:
+                return round(100 - float(match.group(1)), 1)
         except Exception:
             pass
         return 0.0
@@ -175,15 +201,10 @@ class SystemMonitor:
     def _get_memory_info_linux(self) -> Dict[str, float]:
         """Get memory info on Linux via /proc/meminfo."""
         try:
-            with open("/proc/meminfo", "r") as f:
-                lines = f.readlines()
-
-            mem_info = {}
-            for line in lines:
-                parts = line.split()
-                key = parts[0].rstrip(":")
-                value = int(parts[1])
-                mem_info[key] = value
+            mem_info = {
+                key.decode(): int(value)
+                for key, value in _MEMINFO_RE.findall(_read_small("/proc/meminfo"))
+            }
 
             total = mem_info.get("MemTotal", 0) / 1024
             available = mem_info.get("MemAvailable", 0) / 1024
@@ -212,19 +233,13 @@ class SystemMonitor:
             # Get memory stats
             result = subprocess.run(["vm_stat"], capture_output=True, text=True)
 
-            stats = {}
-            for line in result.stdout.split("\n"):
-                if ":" in line:
-                    key, value = line.split(":")
-                    value = value.strip().rstrip(".")
-                    try:
-                        stats[key.strip()] = int(value)
-                    except ValueError:
-                        pass
-
-            page_size = 4096  # Default page size
-            free_pages = stats.get("Pages free", 0)
-            inactive_pages = stats.get("Pages inactive", 0)
+            pages = {key: int(value) for key, value in _VM_STAT_PAGES_RE.findall(result.stdout)}
+
+            # 16 KiB on Apple Silicon; 4 KiB if the header is missing
+            match = _VM_STAT_PAGE_SIZE_RE.search(result.stdout)
+            page_size = int(match.group(1)) if match else 4096
+            free_pages = pages.get("free", 0)
+            inactive_pages = pages.get("inactive", 0)
             available_mb = (free_pages + inactive_pages) * page_size / (1024 * 1024)
             used_mb = total_mb - available_mb
             percent = (used_mb / total_mb * 100) if total_mb > 0 else 0
@@ -242,9 +257,8 @@ class SystemMonitor:
         """Get CPU temperature (Raspberry Pi/Linux specific)."""
         if IS_LINUX:
             try:
-                with open("/sys/class/thermal/thermal_zone0/temp", "r") as f:
-                    temp = int(f.read().strip()) / 1000.0
-                    return round(temp, 1)
+                temp = int(_read_small("/sys/class/thermal/thermal_zone0/temp")) / 1000.0
+                return round(temp, 1)
             except Exception:
                 pass
         elif IS_MACOS:
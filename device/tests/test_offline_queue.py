@@ -0,0 +1,304 @@
+"""
+Tests for the persistent offline queue.
+"""
+
+import shutil
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from src.storage.offline_queue import (
+    OfflineQueue,
+    DetectionEventPayload,
+    SCHEMA_VERSION,
+)
+
+
+BIG_IMAGE = b"\x01" * (OfflineQueue.IMAGE_INLINE_THRESHOLD + 1)
+
+
+def make_payload(event_id: str) -> DetectionEventPayload:
+    return DetectionEventPayload(
+        event_id=event_id,
+        device_id="device-1",
+        camera_id="cam-1",
+        timestamp=1700000000.0,
+        class_name="elephant",
+        class_id=1,
+        confidence=0.9,
+        bbox=[10, 20, 30, 40],
+        image_path=None,
+        image_base64=None,
+        location={"name": "gate"},
+        metadata={"frame": 1},
+    )
+
+
+@pytest.fixture
+def offline_queue(tmp_path):
+    q = OfflineQueue(str(tmp_path / "offline_queue.db"), max_queue_size=1000)
+    assert q.initialize()
+    yield q
+    q.close()
+
+
+def status_counts(q: OfflineQueue):
+    """Return (trigger-maintained counts, counts from the rows themselves)."""
+    with q._get_read_connection() as conn:
+        kept = {
+            row["status"]: row["count"]
+            for row in conn.execute("SELECT status, count FROM queue_counts")
+            if row["count"]
+        }
+        actual = {
+            row["status"]: row["n"]
+            for row in conn.execute(
+                "SELECT status, COUNT(*) AS n FROM detection_queue GROUP BY status"
+            )
+        }
+    return kept, actual
+
+
+def make_baseline_database(db_path):
+    """Write the schema and indexes of the first release, before user_version."""
+    conn = sqlite3.connect(str(db_path))
+    conn.execute("""
+        CREATE TABLE detection_queue (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            event_id TEXT UNIQUE NOT NULL,
+            device_id TEXT NOT NULL,
+            camera_id TEXT NOT NULL,
+            timestamp REAL NOT NULL,
+            class_name TEXT NOT NULL,
+            class_id INTEGER NOT NULL,
+            confidence REAL NOT NULL,
+            bbox TEXT NOT NULL,
+            image_path TEXT,
+            location TEXT NOT NULL,
+            metadata TEXT NOT NULL,
+            status TEXT DEFAULT 'pending',
+            priority INTEGER DEFAULT 0,
+            attempts INTEGER DEFAULT 0,
+            last_attempt REAL,
+            next_retry REAL,
+            error_message TEXT,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE image_cache (
+            event_id TEXT PRIMARY KEY,
+            image_data BLOB NOT NULL,
+            size_bytes INTEGER NOT NULL,
+            created_at REAL NOT NULL
+        )
+    """)
+    conn.execute("CREATE INDEX idx_queue_status ON detection_queue(status)")
+    conn.execute(
+        "CREATE INDEX idx_queue_priority ON detection_queue(priority DESC, created_at ASC)"
+    )
+    now = time.time()
+    for i, status in enumerate(["pending", "pending", "failed"]):
+        conn.execute(
+            """
+            INSERT INTO detection_queue
+            (event_id, device_id, camera_id, timestamp, class_name, class_id,
+             confidence, bbox, location, metadata, status, created_at, updated_at)
+            VALUES (?, 'device-1', 'cam-1', 1.0, 'elephant', 1, 0.9,
+                    '[1, 2, 3, 4]', '{"name": "gate"}', '{}', ?, ?, ?)
+            """,
+            (f"old-{i}", status, now + i, now + i),
+        )
+    conn.execute("INSERT INTO image_cache VALUES ('old-0', x'0102', 2, 0)")
+    conn.commit()
+    conn.close()
+
+
+def trace_writer(monkeypatch):
+    """Record the statements run on the queue's writer connection."""
+    statements = []
+    connect = OfflineQueue._connect
+
+    def traced_connect(self, read_only=False):
+        conn = connect(self, read_only=read_only)
+        if not read_only:
+            conn.set_trace_callback(statements.append)
+        return conn
+
+    monkeypatch.setattr(OfflineQueue, "_connect", traced_connect)
+    return statements
+
+
+def test_migrates_baseline_database(tmp_path, monkeypatch):
+    db_path = tmp_path / "offline_queue.db"
+    make_baseline_database(db_path)
+    statements = trace_writer(monkeypatch)
+
+    q = OfflineQueue(str(db_path))
+    assert q.initialize()
+    try:
+        # The auto-vacuum conversion must not build its copy in memory
+        vacuum = statements.index("VACUUM")
+        temp_store = [sql for sql in statements[:vacuum] if "temp_store" in sql]
+        assert temp_store[-1] == "PRAGMA temp_store=FILE"
+        assert statements[vacuum + 1] == "PRAGMA temp_store=MEMORY"
+
+        with q._get_read_connection() as conn:
+            assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+            assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+            indexes = {row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index'"
+            )}
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(detection_queue)")}
+        assert not indexes & {"idx_queue_status", "idx_queue_priority"}
+        assert {"image_file", "image_size"} <= columns
+
+        items = {item["event_id"]: item for item in q.get_pending_items()}
+        assert sorted(items) == ["old-0", "old-1"]
+        assert items["old-0"]["bbox"] == [1, 2, 3, 4]
+        assert items["old-0"]["location"] == {"name": "gate"}
+        assert items["old-0"]["image_data"] == b"\x01\x02"
+
+        assert q.enqueue(make_payload("new"))
+        stats = q.get_stats()
+        assert stats["pending"] == 3 and stats["failed"] == 1
+    finally:
+        q.close()
+
+
+def test_auto_vacuum_conversion_waits_for_disk_space(tmp_path, monkeypatch):
+    db_path = tmp_path / "offline_queue.db"
+    make_baseline_database(db_path)
+    usage = shutil.disk_usage(tmp_path)
+    monkeypatch.setattr(
+        shutil, "disk_usage", lambda path: usage._replace(free=1024)
+    )
+
+    q = OfflineQueue(str(db_path))
+    assert q.initialize()
+    q.close()
+    with sqlite3.connect(str(db_path)) as conn:
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 0
+
+    monkeypatch.undo()
+    q = OfflineQueue(str(db_path))
+    assert q.initialize()
+    q.close()
+    with sqlite3.connect(str(db_path)) as conn:
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+
+def test_failing_write_in_batch_rolls_back_alone(offline_queue, monkeypatch):
+    batch_sizes = []
+    run_write_batch = offline_queue._run_write_batch
+
+    def record_batch(batch):
+        batch_sizes.append(len(batch))
+        run_write_batch(batch)
+
+    monkeypatch.setattr(offline_queue, "_run_write_batch", record_batch)
+
+    def failing_write(conn):
+        conn.execute("DELETE FROM detection_queue")
+        raise sqlite3.IntegrityError("rejected")
+
+    errors = []
+
+    def submit_failing():
+        try:
+            offline_queue._write(failing_write)
+        except sqlite3.IntegrityError as e:
+            errors.append(e)
+
+    # Hold the writer so the next three writes queue up behind it
+    release = threading.Event()
+    blocker = threading.Thread(
+        target=offline_queue._write,
+        args=(lambda conn: release.wait(10),),
+        kwargs={"transactional": False},
+    )
+    blocker.start()
+    while not batch_sizes:
+        time.sleep(0.01)
+
+    threads = [
+        threading.Thread(target=offline_queue.enqueue, args=(make_payload("a"),)),
+        threading.Thread(target=submit_failing),
+        threading.Thread(target=offline_queue.enqueue, args=(make_payload("b"),)),
+    ]
+    for expected, thread in enumerate(threads, start=1):
+        thread.start()
+        while offline_queue._write_queue.qsize() < expected:
+            time.sleep(0.01)
+
+    release.set()
+    for thread in [blocker] + threads:
+        thread.join(10)
+
+    assert batch_sizes == [1, 3]
+    assert len(errors) == 1
+    pending = sorted(item["event_id"] for item in offline_queue.get_pending_items())
+    assert pending == ["a", "b"]
+    kept, actual = status_counts(offline_queue)
+    assert kept == actual == {"pending": 2}
+
+
+def test_queue_counts_match_rows_under_concurrent_writes(offline_queue):
+    for i in range(50):
+        assert offline_queue.enqueue(make_payload(f"seed-{i}"))
+
+    def enqueue_new():
+        for i in range(50):
+            offline_queue.enqueue(make_payload(f"new-{i}"))
+
+    def complete_seeds():
+        for i in range(0, 50, 2):
+            offline_queue.mark_completed([f"seed-{i}"])
+
+    def fail_seeds():
+        for _ in range(offline_queue.MAX_RETRY_ATTEMPTS):
+            for i in range(1, 50, 2):
+                offline_queue.mark_failed(f"seed-{i}", "timeout")
+
+    threads = [
+        threading.Thread(target=target)
+        for target in (enqueue_new, complete_seeds, fail_seeds)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+
+    kept, actual = status_counts(offline_queue)
+    assert kept == actual
+    assert actual == {"pending": 50, "failed": 25}
+    stats = offline_queue.get_stats()
+    assert stats["pending"] == 50 and stats["failed"] == 25
+
+
+def test_duplicate_enqueue_keeps_spilled_image(offline_queue, monkeypatch):
+    assert offline_queue.enqueue(make_payload("big"), image_data=BIG_IMAGE)
+    spilled = list(offline_queue.image_dir.iterdir())
+    assert len(spilled) == 1
+
+    # A duplicate with a different image leaves the queued one alone
+    assert offline_queue.enqueue(make_payload("big"), image_data=b"\x02" * len(BIG_IMAGE))
+    assert offline_queue.get_image_data("big") == BIG_IMAGE
+    assert list(offline_queue.image_dir.iterdir()) == spilled
+
+    # So does a duplicate whose write fails
+    def failing_enqueue(conn, *args):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(offline_queue, "_enqueue_op", failing_enqueue)
+    assert not offline_queue.enqueue(make_payload("big"), image_data=b"\x03" * len(BIG_IMAGE))
+    monkeypatch.undo()
+
+    assert offline_queue.get_image_data("big") == BIG_IMAGE
+    assert list(offline_queue.image_dir.iterdir()) == spilled
+
+    offline_queue.mark_completed(["big"])
+    assert list(offline_queue.image_dir.iterdir()) == []